@@ -1,7 +1,17 @@
 import os
+import logging
+import logging.handlers
+import queue
+import re
+import shutil
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html
 import pandas as pd
 from urllib.parse import urljoin
 from tqdm import tqdm
@@ -13,6 +23,75 @@ IMAGE_DIR = "images_signaux"
 CSV_FILE = "signaux_routiers.csv"
 CID_FILE = "cid.csv"
 HISTORY_FILE = "historique.log"
+REQUEST_TIMEOUT = (3.05, 10)  # (connexion, lecture) en secondes
+RATE_LIMIT = 4  # Nombre maximal de requêtes par seconde vers le serveur
+RATE_BURST = 4  # Nombre de requêtes pouvant partir d'un coup
+MAX_WORKERS = 16  # Nombre de CID traités en parallèle
+IMAGE_CHUNK_SIZE = 64 * 1024  # Taille des blocs écrits sur disque, en octets
+CID_CHECKPOINT = 100  # Sauvegarde des CSV tous les N CID traités
+CID_LOG_FILE = CID_FILE + ".log"  # Journal des CID traités, fusionné dans cid.csv en fin d'exécution
+CACHE_FILE = "mtq_cache.sqlite"  # Cache HTTP des pages de détails
+CACHE_EXPIRE_AFTER = 86400  # Durée de validité du cache, en secondes
+
+# Sélecteurs XPath compilés une seule fois
+FICHE_PREFIX = "ctl00_cphContenu_FicheDetails_txt"
+# Lignes du tableau des dimensions, sauf l'en-tête et les lignes sans paire
+# dimension / code IMP (ex. une cellule unique « aucune »)
+DIMENSIONS_ROWS_XPATH = etree.XPath(
+    "(//table[@summary='Dimensions disponibles en milimètres pour ce dispositif "
+    "suivi du code IMP correspondant.']//tr)[position() > 1][count(td) >= 2]")
+IMAGE_SRC_XPATH = etree.XPath("//div[@id='Image220Centrer']//img/@src")
+IMAGE_DIV_RE = re.compile(rb"""id=["']Image220Centrer["']""")
+
+# Table de nettoyage des champs texte (voir clean_text)
+_NEWLINE_TABLE = str.maketrans({"\n": " ", "\r": None})
+
+# Colonnes de signaux_routiers.csv et id des spans correspondants
+FIELD_IDS = {
+    "Numero": FICHE_PREFIX + "Numero",
+    "Nom": FICHE_PREFIX + "Nom",
+    "Reference_Tome_V": FICHE_PREFIX + "ReferenceTomeV",
+    "Reference_VHR": FICHE_PREFIX + "ReferenceVHR",
+    "Description": FICHE_PREFIX + "Description",
+    "Usages": FICHE_PREFIX + "Usage",
+    "Couleur": FICHE_PREFIX + "Couleur",
+    "Type_Pellicule": FICHE_PREFIX + "TypePellicule",
+}
+FIELD_ID_SET = frozenset(FIELD_IDS.values())
+
+# Session HTTP partagée : réutilise la connexion HTTPS (keep-alive) entre les CID.
+# Les pages de détails sont mises en cache sur disque pour accélérer les
+# exécutions suivantes ; les images ne sont pas mises en cache (filter_fn :
+# avec cache_control, les en-têtes de l'image passeraient outre DO_NOT_CACHE).
+SESSION = requests_cache.CachedSession(
+    CACHE_FILE,
+    backend="sqlite",
+    expire_after=CACHE_EXPIRE_AFTER,
+    urls_expire_after={
+        # requests-cache compare le début de l'URL, sans le schéma
+        BASE_URL.split("://")[1]: CACHE_EXPIRE_AFTER,
+        "*": requests_cache.DO_NOT_CACHE,
+    },
+    cache_control=True,
+    stale_if_error=True,
+    filter_fn=lambda response: response.url.startswith(BASE_URL))
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504])))
+SESSION.headers.update({
+    "User-Agent": "mtqScrap/1.0 (+https://github.com/betkalyas/mtqScrap)",
+    "Accept-Encoding": "gzip, deflate",
+})
+
+# Journal des CID en erreur : les messages passent par une file et
+# sont écrits dans HISTORY_FILE par un thread dédié (voir scraper)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+_log_queue = queue.Queue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
 
 # Créer les dossiers nécessaires
 os.makedirs(IMAGE_DIR, exist_ok=True)
@@ -44,179 +123,312 @@ def save_cid_data(cid_df):
     cid_df.to_csv(CID_FILE, index=False)
 
 
+def merge_cid_log():
+    """
+    Intègre le journal des CID (cid.csv.log) dans cid.csv puis le supprime.
+    Pour un CID présent plusieurs fois, la dernière occurrence est conservée.
+    """
+    if not os.path.exists(CID_LOG_FILE):
+        return
+    if os.path.getsize(CID_LOG_FILE) > 0:
+        log_df = pd.read_csv(CID_LOG_FILE, names=["cid", "has_image"], dtype=str)
+        # Ignorer les lignes incomplètes (ex. dernière ligne tronquée après un
+        # arrêt brutal) pour ne pas corrompre les types de cid.csv
+        log_df = log_df[log_df["cid"].str.isdigit().fillna(False)
+                        & log_df["has_image"].isin(["True", "False"])]
+        log_df = log_df.astype({"cid": int})
+        log_df["has_image"] = log_df["has_image"] == "True"
+        cid_df = pd.concat([load_cid_data(), log_df], ignore_index=True)
+        save_cid_data(cid_df.drop_duplicates(subset="cid", keep="last"))
+    os.remove(CID_LOG_FILE)
+
+
 def load_signal_data():
     """
     Charge les données existantes depuis signaux_routiers.csv.
-    Retourne un DataFrame Pandas.
+    Retourne un DataFrame Pandas. Les valeurs "N/A" sont conservées telles quelles.
     """
     if os.path.exists(CSV_FILE):
-        return pd.read_csv(CSV_FILE)
+        return pd.read_csv(CSV_FILE, keep_default_na=False)
     return pd.DataFrame()
 
 
-def update_signal_data(existing_df, new_data):
+def append_signal_data(data_list):
+    """
+    Ajoute les nouvelles données à la fin de signaux_routiers.csv, sans relire
+    le fichier existant. L'en-tête n'est écrit que si le fichier est vide.
+    Un CID re-scrapé apparaît donc plusieurs fois jusqu'au prochain compact_signal_data().
+    """
+    with open(CSV_FILE, "a", newline="", encoding="utf-8") as f:
+        pd.DataFrame(data_list).to_csv(f, header=f.tell() == 0, index=False)
+
+
+def compact_signal_data():
     """
-    Met à jour les données existantes avec les nouvelles données.
-    Si un CID existe déjà, ses données sont mises à jour.
-    Sinon, une nouvelle ligne est ajoutée.
+    Supprime les doublons de signaux_routiers.csv en gardant, pour chaque CID,
+    la dernière occurrence (mise à jour).
     """
-    new_df = pd.DataFrame(new_data)
-    combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-    # Supprimer les doublons en gardant la dernière occurrence (mise à jour)
-    combined_df = combined_df.drop_duplicates(subset=["cid"], keep="last")
-    return combined_df
+    signal_df = load_signal_data()
+    if signal_df.empty:
+        return
+    signal_df = signal_df.drop_duplicates(subset=["cid"], keep="last")
+    signal_df.to_csv(CSV_FILE, index=False)
+
+
+# Seau à jetons partagé par tous les threads (voir polite_delay)
+_bucket_lock = threading.Lock()
+_bucket_tokens = float(RATE_BURST)
+_bucket_updated_at = time.monotonic()
 
 
-def check_image(cid):
+def polite_delay():
     """
-    Vérifie si un CID a une image.
+    Limite le débit global à RATE_LIMIT requêtes par seconde (seau à jetons).
+    Jusqu'à RATE_BURST requêtes peuvent partir sans attendre ; au-delà, chaque
+    appel réserve son jeton puis attend, hors verrou, le temps qu'il soit
+    disponible. Les autres threads ne sont donc jamais bloqués par ce délai.
+    """
+    global _bucket_tokens, _bucket_updated_at
+    with _bucket_lock:
+        now = time.monotonic()
+        _bucket_tokens = min(RATE_BURST,
+                             _bucket_tokens + (now - _bucket_updated_at) * RATE_LIMIT)
+        _bucket_updated_at = now
+        _bucket_tokens -= 1
+        wait = -_bucket_tokens / RATE_LIMIT
+    if wait > 0:
+        time.sleep(wait)
+
+
+def fetch_page(cid):
+    """
+    Télécharge la page de détails d'un CID.
+    Retourne le contenu HTML (bytes), ou None en cas d'erreur.
     """
     url = f"{BASE_URL}?cid={cid}"
     try:
-        response = requests.get(url, timeout=10)
+        # Une page en cache et encore valide ne sollicite pas le serveur :
+        # pas de délai (réponse 504 si la page n'est pas en cache)
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT, only_if_cached=True)
+        if response.status_code == 200 and not response.is_expired:
+            return response.content
+
+        polite_delay()
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
         if response.status_code != 200:
-            return False
+            logger.warning("Erreur %s pour CID %s", response.status_code, cid)
+            return None
     except requests.RequestException:
-        return False
+        logger.warning("Erreur de connexion pour CID %s", cid)
+        return None
+    return response.content
+
+
+def fetch_image(img_url, img_filename):
+    """
+    Télécharge une image et l'enregistre dans img_filename.
+    Retourne True si l'image a été sauvegardée.
+    L'image est écrite dans un fichier .part, renommé une fois le
+    téléchargement terminé : un transfert interrompu ne laisse pas d'image
+    tronquée.
+    """
+    polite_delay()
+    part_filename = img_filename + ".part"
+    # Écrire l'image au fil du téléchargement plutôt que de la garder en mémoire
+    with SESSION.get(img_url, timeout=REQUEST_TIMEOUT, stream=True) as img_response:
+        if img_response.status_code != 200:
+            return False
+        img_response.raw.decode_content = True
+        try:
+            with open(part_filename, "wb") as f:
+                shutil.copyfileobj(img_response.raw, f, length=IMAGE_CHUNK_SIZE)
+            os.replace(part_filename, img_filename)
+        except BaseException:
+            if os.path.exists(part_filename):
+                os.remove(part_filename)
+            raise
+    return True
+
+
+def clean_text(text):
+    """
+    Supprime les espaces en bordure, remplace les sauts de ligne par des
+    espaces et retire les retours chariot. Les deux replace() successifs
+    sont remplacés par un seul translate().
+    """
+    return text.strip().translate(_NEWLINE_TABLE)
+
+
+_parser_local = threading.local()
+
+
+def parse_page(content):
+    """
+    Construit l'arbre lxml d'une page à partir du HTML brut (bytes).
+    L'encodage UTF-8 est imposé au parseur : sans balise meta charset, lxml
+    lirait la page en latin-1. Un parseur est créé par thread, les parseurs
+    lxml ne devant pas être partagés entre threads.
+    """
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        parser = _parser_local.parser = html.HTMLParser(encoding="utf-8")
+    return html.fromstring(content, parser=parser)
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    image_container = soup.find("div", id="Image220Centrer")
-    return bool(image_container and image_container.find("img"))
+
+def process_cid(cid):
+    """
+    Traite un CID : télécharge la page une seule fois, vérifie l'image,
+    extrait les données et télécharge l'image.
+    Retourne un tuple (has_image, data) ; has_image vaut None si la page n'a
+    pas pu être traitée, et data vaut None si le CID n'a pas d'image.
+    """
+    # Initialiser un dictionnaire pour stocker les données
+    data = {"cid": cid}
+
+    try:
+        # Télécharger la page
+        content = fetch_page(cid)
+        if content is None:
+            return None, None
+
+        # Vérifier l'existence de l'image : le conteneur est d'abord cherché
+        # dans le HTML brut pour éviter de parser les pages qui n'en ont pas
+        img_srcs = []
+        if IMAGE_DIV_RE.search(content):
+            tree = parse_page(content)
+            img_srcs = IMAGE_SRC_XPATH(tree)
+        if not img_srcs:
+            # Pas d'image : le CID sera ajouté à cid.csv sans image
+            return False, None
+
+        # Extraire tous les champs de la fiche en un seul parcours des spans,
+        # en ne gardant que les id connus (recherche dans un ensemble)
+        found = {}
+        for span in tree.iter("span"):
+            span_id = span.get("id")
+            if span_id in FIELD_ID_SET:
+                found[span_id] = clean_text(span.text_content())
+        for column, span_id in FIELD_IDS.items():
+            data[column] = found.get(span_id, "N/A")
+
+        # Extraire les dimensions (deux premières cellules de chaque ligne)
+        dimensions = []
+        for row in DIMENSIONS_ROWS_XPATH(tree):
+            cols = row.findall("td")
+            dimensions.append({
+                "Dimensions_mm": cols[0].text_content().strip(),
+                "Code_IMP": cols[1].text_content().strip()
+            })
+        data["Dimensions"] = str(dimensions) if dimensions else "N/A"
+
+        # Télécharger l'image
+        img_url = urljoin(BASE_URL, img_srcs[0])
+        img_filename = os.path.join(
+            IMAGE_DIR, f"{data['Numero']}-{data['cid']}.png")
+        fetch_image(img_url, img_filename)
+        return True, data
+
+    except Exception as e:
+        logger.warning("Erreur lors du traitement de CID %s: %s", cid, e)
+        return None, None
 
 
-def scraper(cid_start, cid_end, mode="minimal"):
+def disk_writer(write_queue):
+    """
+    Thread d'écriture : écrit sur disque les lots reçus par write_queue, pour
+    que le thread principal ne soit jamais bloqué par la sauvegarde des CSV.
+    Chaque élément est un tuple (fichier, lignes) ; None arrête le thread.
+    Les CID sont ajoutés ligne par ligne à CID_LOG_FILE, vidé sur disque
+    tous les CID_CHECKPOINT CID.
+    """
+    pending = 0  # Lignes écrites dans le journal depuis le dernier flush
+    with open(CID_LOG_FILE, "a", encoding="utf-8") as cid_log:
+        while True:
+            item = write_queue.get()
+            if item is None:
+                break
+            target, rows = item
+            try:
+                if target == CID_LOG_FILE:
+                    for row in rows:
+                        cid_log.write(f"{row['cid']},{row['has_image']}\n")
+                    pending += len(rows)
+                    if pending >= CID_CHECKPOINT:
+                        cid_log.flush()
+                        pending = 0
+                else:
+                    append_signal_data(rows)
+            except Exception as e:
+                logger.warning("Erreur lors de l'écriture de %s: %s", target, e)
+
+
+def scraper(cid_start, cid_end, mode="minimal", max_workers=MAX_WORKERS):
     """
     Scraper principal avec trois modes d'exécution :
     - "full" : Tous les CID sont traités.
     - "minimal" : Ignore les CID déjà dans cid.csv (par défaut).
     - "partial" : Ignore seulement les CID sans image.
+    Les CID sont traités en parallèle par max_workers threads.
     """
     exit_type = "normal"  # Type de fermeture initial
     updated_count = 0  # Compteur des champs mis à jour
+    data_list = []
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    write_queue = queue.Queue()
+    writer = None
+
+    # Écrire le journal depuis un thread dédié pour ne pas ralentir les workers
+    log_handler = logging.FileHandler(HISTORY_FILE, encoding="utf-8")
+    log_handler.setFormatter(logging.Formatter(
+        "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+    log_listener = logging.handlers.QueueListener(_log_queue, log_handler)
+    log_listener.start()
 
     try:
-        # Charger les CID existants
+        # Charger les CID existants, y compris ceux d'une exécution interrompue
+        merge_cid_log()
         cid_df = load_cid_data()
-        existing_cids = set(cid_df["cid"]) if not cid_df.empty else set()
-        data_list = []
+        # has_image est comparé à "True" : astype(bool) rendrait "False" vrai
+        has_image_map = dict(zip(cid_df["cid"].astype(int),
+                                 cid_df["has_image"].astype(str) == "True"))
 
-        # Charger les données existantes de signalisation routière
-        existing_signal_data = load_signal_data()
+        # Les fichiers de sortie sont écrits par un thread dédié
+        writer = threading.Thread(target=disk_writer, args=(write_queue,), daemon=True)
+        writer.start()
 
-        for cid in tqdm(range(cid_start, cid_end + 1), desc=f"Mode {mode}"):
+        for cid in range(cid_start, cid_end + 1):
             # Mode minimal : Ignorer les CID déjà dans cid.csv
-            if mode == "minimal" and cid in existing_cids:
-                print(f"CID {cid} déjà traité. Passage au suivant.")
+            if mode == "minimal" and cid in has_image_map:
                 continue
 
             # Mode partiel : Ignorer les CID sans image
             if mode == "partial":
-                if cid in existing_cids and cid_df.loc[cid_df["cid"] == cid, "has_image"].values[0] == False:
-                    print(f"CID {cid} sans image. Passage au suivant.")
+                if cid in has_image_map and not has_image_map[cid]:
                     continue
 
-            # Vérifier l'existence de l'image
-            has_image = check_image(cid)
-            if not has_image:
-                print(f"Pas d'image trouvée pour CID {cid}. Ajout à cid.csv.")
-                cid_df = pd.concat([cid_df, pd.DataFrame(
-                    {"cid": [cid], "has_image": [False]})], ignore_index=True)
-                save_cid_data(cid_df)
-                continue
+            futures[executor.submit(process_cid, cid)] = cid
 
-            # Télécharger la page et extraire les données
-            url = f"{BASE_URL}?cid={cid}"
-            try:
-                response = requests.get(url, timeout=10)
-                if response.status_code != 200:
-                    print(f"Erreur {response.status_code} pour CID {cid}")
-                    continue
-            except requests.RequestException:
-                print(f"Erreur de connexion pour CID {cid}")
+        # Les résultats sont consommés ici, dans le thread principal ; les lots
+        # complets sont confiés au thread d'écriture.
+        for future in tqdm(as_completed(futures), total=len(futures), desc=f"Mode {mode}",
+                           miniters=50, mininterval=0.5):
+            cid = futures[future]
+            has_image, data = future.result()
+            if has_image is None:
                 continue
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            has_image_map[cid] = has_image
 
-            # Initialiser un dictionnaire pour stocker les données
-            data = {"cid": cid}
-
-            try:
-                # Extraire les données avec vérification de l'existence des champs
-                data["Numero"] = soup.find(
-                    "span", id="ctl00_cphContenu_FicheDetails_txtNumero").text.strip().replace("\n", " ").replace("\r", "") \
-                    if soup.find("span", id="ctl00_cphContenu_FicheDetails_txtNumero") else "N/A"
-
-                data["Nom"] = soup.find("span", id="ctl00_cphContenu_FicheDetails_txtNom").text.strip().replace("\n", " ").replace("\r", "") \
-                    if soup.find("span", id="ctl00_cphContenu_FicheDetails_txtNom") else "N/A"
-
-                # Gestion des références (Tome V ou VHR)
-                reference_tome_v = soup.find(
-                    "span", id="ctl00_cphContenu_FicheDetails_txtReferenceTomeV")
-                reference_vhr = soup.find(
-                    "span", id="ctl00_cphContenu_FicheDetails_txtReferenceVHR")
-                data["Reference_Tome_V"] = reference_tome_v.text.strip().replace(
-                    "\n", " ").replace("\r", "") if reference_tome_v else "N/A"
-                data["Reference_VHR"] = reference_vhr.text.strip(
-                ) if reference_vhr else "N/A"
-
-                data["Description"] = soup.find(
-                    "span", id="ctl00_cphContenu_FicheDetails_txtDescription").text.strip().replace("\n", " ").replace("\r", "") \
-                    if soup.find("span", id="ctl00_cphContenu_FicheDetails_txtDescription") else "N/A"
-
-                data["Usages"] = soup.find(
-                    "span", id="ctl00_cphContenu_FicheDetails_txtUsage").text.strip().replace("\n", " ").replace("\r", "") \
-                    if soup.find("span", id="ctl00_cphContenu_FicheDetails_txtUsage") else "N/A"
-
-                data["Couleur"] = soup.find(
-                    "span", id="ctl00_cphContenu_FicheDetails_txtCouleur").text.strip().replace("\n", " ").replace("\r", "") \
-                    if soup.find("span", id="ctl00_cphContenu_FicheDetails_txtCouleur") else "N/A"
-
-                data["Type_Pellicule"] = soup.find(
-                    "span", id="ctl00_cphContenu_FicheDetails_txtTypePellicule").text.strip().replace("\n", " ").replace("\r", "") \
-                    if soup.find("span", id="ctl00_cphContenu_FicheDetails_txtTypePellicule") else "N/A"
-
-                # Extraire les dimensions
-                dimensions = []
-                table = soup.find("table", {
-                                  "summary": "Dimensions disponibles en milimètres pour ce dispositif suivi du code IMP correspondant."})
-                if table:
-                    for row in table.find_all("tr", class_=["gris", ""])[1:]:
-                        cols = row.find_all("td")
-                        dimensions.append({
-                            "Dimensions_mm": cols[0].text.strip(),
-                            "Code_IMP": cols[1].text.strip()
-                        })
-                data["Dimensions"] = str(dimensions) if dimensions else "N/A"
-
-                # Télécharger l'image
-                img_url = soup.find("div", id="Image220Centrer").find("img")["src"]
-                img_url = urljoin(BASE_URL, img_url)
-                img_response = requests.get(img_url, timeout=10)
-                if img_response.status_code == 200:
-                    img_filename = os.path.join(
-                        IMAGE_DIR, f"{data['Numero']}-{data['cid']}.png")
-                    with open(img_filename, "wb") as f:
-                        f.write(img_response.content)
-
-                # Ajouter le CID à cid.csv avec has_image=True
-                cid_df = pd.concat([cid_df, pd.DataFrame(
-                    {"cid": [cid], "has_image": [True]})], ignore_index=True)
-                save_cid_data(cid_df)
+            # Ajouter le CID au journal de cid.csv
+            write_queue.put((CID_LOG_FILE, [{"cid": cid, "has_image": has_image}]))
 
+            if data is not None:
                 data_list.append(data)
                 updated_count += 1
-                time.sleep(0.25)  # Respecter les serveurs
-
-            except Exception as e:
-                print(f"Erreur lors du traitement de CID {cid}: {e}")
-                continue
-
-        # Mettre à jour les données existantes
-        if data_list:
-            updated_signal_data = update_signal_data(
-                existing_signal_data, data_list)
-            updated_signal_data.to_csv(CSV_FILE, index=False)
-            print(f"Les données ont été mises à jour dans {CSV_FILE}")
+                if len(data_list) >= CID_CHECKPOINT:
+                    write_queue.put((CSV_FILE, data_list))
+                    data_list = []
 
     except KeyboardInterrupt:
         exit_type = "interruption keyboard"
@@ -225,12 +437,31 @@ def scraper(cid_start, cid_end, mode="minimal"):
         exit_type = "crash"
         print(f"\nErreur inattendue : {e}. Sauvegarde des données partielles...")
     finally:
-        # Sauvegarder les données partielles si nécessaire
-        if data_list:
-            updated_signal_data = update_signal_data(
-                existing_signal_data, data_list)
-            updated_signal_data.to_csv(CSV_FILE, index=False)
-            print(f"Données partielles sauvegardées dans {CSV_FILE}")
+        # Annuler les CID pas encore démarrés sans attendre ceux en cours
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+        if writer is not None:
+            # Sauvegarder les données restantes
+            if data_list:
+                write_queue.put((CSV_FILE, data_list))
+
+            # Attendre la fin des écritures en cours
+            write_queue.put(None)
+            writer.join()
+
+            # Reconstruire cid.csv à partir du journal
+            merge_cid_log()
+
+            if updated_count and exit_type == "normal":
+                print(f"Les données ont été mises à jour dans {CSV_FILE}")
+            elif updated_count:
+                print(f"Données partielles sauvegardées dans {CSV_FILE}")
+
+        # Vider le journal avant d'y ajouter le résumé de l'exécution
+        log_listener.stop()
+        log_handler.close()
 
         # Enregistrer l'exécution dans l'historique
         log_execution(mode, cid_start, cid_end, updated_count, exit_type)
@@ -241,5 +472,8 @@ if __name__ == "__main__":
     CID_START = 10000  # Modifier ici
     CID_END = 11111    # Modifier ici
     MODE = "minimal"   # Options : "full", "minimal", "partial"
+    COMPACT = False    # Supprimer les doublons de signaux_routiers.csv après l'exécution
 
-    scraper(CID_START, CID_END, mode=MODE)
\ No newline at end of file
+    scraper(CID_START, CID_END, mode=MODE)
+    if COMPACT:
+        compact_signal_data()
\ No newline at end of file